@@ -1939,6 +1939,33 @@ class DESScheduler:
             print(f"\n[WARN] PENDING CORE: {summary['pending_core']} orders need cores not in inventory")
 
 
+def run_des_schedule(orders: List[Dict], core_mapping: Dict, core_inventory: Dict,
+                     working_days: List[int], shift_hours: int = 12,
+                     day_configs: Dict[int, DayShiftConfig] = None,
+                     wip_orders: List[Dict] = None,
+                     hot_list_entries: List[Dict] = None) -> Tuple[List, List[Dict], List[Dict]]:
+    """
+    Build a DESScheduler and run one schedule pass.
+
+    Module-level (and free of app state) so it can be shipped to a worker
+    process. Inputs are only read; the scheduler copies core inventory.
+
+    Returns:
+        (scheduled_orders, pending_core_orders, hot_list_core_shortages)
+    """
+    scheduler = DESScheduler(
+        orders=orders,
+        core_mapping=core_mapping,
+        core_inventory=core_inventory,
+        working_days=working_days,
+        shift_hours=shift_hours,
+        day_configs=day_configs,
+        wip_orders=wip_orders
+    )
+    scheduled = scheduler.schedule_orders(hot_list_entries=hot_list_entries)
+    return scheduled, scheduler.pending_core_orders, scheduler.hot_list_core_shortages
+
+
 if __name__ == "__main__":
     import sys
     import os
@@ -206,7 +206,7 @@ class ScheduledOperation:
     setup_time: float = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledOrder:
     """A fully scheduled order."""
     wo_number: str
@@ -233,6 +233,10 @@ class ScheduledOrder:
     days_idle: int = None  # From Shop Dispatch "Elapsed Days" (9999→0)
     oso_op_number: str = None  # From OSO "Operation Number" column
     oso_op_description: str = None  # From OSO "Current Operation Description" column
+    deadline: datetime = field(init=False, default=None, repr=False, compare=False)  # basic_finish_date or promise_date
+
+    def __post_init__(self):
+        self.deadline = self.basic_finish_date or self.promise_date
 
 
 @dataclass
@@ -7,13 +7,21 @@ Supports local filesystem fallback for development:
 """
 
 import os
+import gzip
 import json
+import logging
 import shutil
 import tempfile
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import orjson
+
+logger = logging.getLogger(__name__)
+
 
 # ============== Storage Mode Detection ==============
 
@@ -23,20 +31,46 @@ LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR',
 
 if not USE_LOCAL_STORAGE:
     try:
+        import google.auth
+        from google.auth.credentials import Signing
+        from google.auth.transport.requests import Request
         from google.cloud import storage
+        from google.cloud.storage import transfer_manager
         from google.cloud.exceptions import NotFound
+        from requests.adapters import HTTPAdapter
     except ImportError:
-        print("[GCS] google-cloud-storage not installed, falling back to local storage")
+        logger.warning("[GCS] google-cloud-storage not installed, falling back to local storage")
         USE_LOCAL_STORAGE = True
 
 
 # Bucket name - can be overridden via environment variable
 BUCKET_NAME = os.environ.get('GCS_BUCKET', 'estradabot-files')
 
+# Serve report downloads via short-lived V4 signed URLs instead of proxying
+# the bytes through the app. Needs iam.serviceAccounts.signBlob on Cloud Run.
+SIGNED_DOWNLOADS = os.environ.get('SIGNED_DOWNLOADS', 'false').lower() == 'true'
+SIGNED_URL_EXPIRATION_MINUTES = 10
+
 # Folders in the bucket
 UPLOADS_FOLDER = 'uploads'
 OUTPUTS_FOLDER = 'outputs'
 
+# Connections kept open by the shared client; enough for the download and
+# report upload thread pools to run without queueing on the pool
+HTTP_POOL_SIZE = 32
+
+# Parallel blob downloads when fetching input files for a schedule run
+DOWNLOAD_WORKERS = 8
+
+# Blob transfers larger than this go in chunks of this size (resumable
+# uploads, ranged downloads), so a transient error only retries one chunk
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_TIMEOUT = 120
+# Files this large (the master schedule on a big backlog) are split into
+# parts and sent concurrently as an XML multipart upload
+PARALLEL_UPLOAD_THRESHOLD = 4 * TRANSFER_CHUNK_SIZE
+PARALLEL_UPLOAD_WORKERS = 4
+
 
 # ============== Local Filesystem Storage ==============
 
@@ -51,7 +85,7 @@ def _local_path(folder: str, filename: str) -> str:
 def _local_upload_file(local_path: str, filename: str, folder: str = UPLOADS_FOLDER) -> str:
     dest = _local_path(folder, filename)
     shutil.copy2(local_path, dest)
-    print(f"[LOCAL] Copied {filename} to {dest}")
+    logger.info("[LOCAL] Copied %s to %s", filename, dest)
     return f"{folder}/{filename}"
 
 
@@ -60,7 +94,7 @@ def _local_upload_file_object(file_obj, filename: str, folder: str = UPLOADS_FOL
     file_obj.seek(0)
     with open(dest, 'wb') as f:
         f.write(file_obj.read())
-    print(f"[LOCAL] Saved {filename} to {dest}")
+    logger.debug("[LOCAL] Saved %s to %s", filename, dest)
     return f"{folder}/{filename}"
 
 
@@ -131,11 +165,45 @@ def _local_load_json(filepath: str):
 # ============== GCS Functions ==============
 
 
+_client = None
+_credentials = None
+_client_lock = threading.Lock()
+
+
 def get_client():
-    """Get GCS client. Uses default credentials in Cloud Run."""
+    """
+    Get the shared GCS client. Uses default credentials in Cloud Run.
+
+    The client is created once so every call reuses its authenticated
+    session and keep-alive connections instead of paying a new TLS
+    handshake and token fetch.
+    """
+    global _client
     if USE_LOCAL_STORAGE:
         return None
-    return storage.Client()
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = storage.Client()
+                client._http.mount('https://', HTTPAdapter(
+                    pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+                _client = client
+    return _client
+
+
+def get_credentials():
+    """
+    Get the shared default credentials used to sign download URLs.
+
+    Loaded once; callers refresh the token only when it has expired.
+    """
+    global _credentials
+    if _credentials is None:
+        with _client_lock:
+            if _credentials is None:
+                _credentials, _ = google.auth.default(
+                    scopes=['https://www.googleapis.com/auth/cloud-platform'])
+    return _credentials
 
 
 def get_bucket():
@@ -162,9 +230,14 @@ def upload_file(local_path: str, filename: str, folder: str = UPLOADS_FOLDER) ->
         return _local_upload_file(local_path, filename, folder)
     bucket = get_bucket()
     blob_path = f"{folder}/{filename}"
-    blob = bucket.blob(blob_path)
-    blob.upload_from_filename(local_path)
-    print(f"[GCS] Uploaded {filename} to gs://{BUCKET_NAME}/{blob_path}")
+    blob = bucket.blob(blob_path, chunk_size=TRANSFER_CHUNK_SIZE)
+    if os.path.getsize(local_path) >= PARALLEL_UPLOAD_THRESHOLD:
+        transfer_manager.upload_chunks_concurrently(
+            local_path, blob, chunk_size=TRANSFER_CHUNK_SIZE,
+            max_workers=PARALLEL_UPLOAD_WORKERS, worker_type=transfer_manager.THREAD)
+    else:
+        blob.upload_from_filename(local_path, timeout=UPLOAD_TIMEOUT)
+    logger.info("[GCS] Uploaded %s to gs://%s/%s", filename, BUCKET_NAME, blob_path)
     return blob_path
 
 
@@ -184,9 +257,9 @@ def upload_file_object(file_obj, filename: str, folder: str = UPLOADS_FOLDER) ->
         return _local_upload_file_object(file_obj, filename, folder)
     bucket = get_bucket()
     blob_path = f"{folder}/{filename}"
-    blob = bucket.blob(blob_path)
-    blob.upload_from_file(file_obj)
-    print(f"[GCS] Uploaded {filename} to gs://{BUCKET_NAME}/{blob_path}")
+    blob = bucket.blob(blob_path, chunk_size=TRANSFER_CHUNK_SIZE)
+    blob.upload_from_file(file_obj, timeout=UPLOAD_TIMEOUT)
+    logger.info("[GCS] Uploaded %s to gs://%s/%s", filename, BUCKET_NAME, blob_path)
     return blob_path
 
 
@@ -210,10 +283,10 @@ def download_file(filename: str, local_path: str, folder: str = UPLOADS_FOLDER)
 
     try:
         blob.download_to_filename(local_path)
-        print(f"[GCS] Downloaded {filename} to {local_path}")
+        logger.debug("[GCS] Downloaded %s to %s", filename, local_path)
         return True
     except NotFound:
-        print(f"[GCS] File not found: {blob_path}")
+        logger.info("[GCS] File not found: %s", blob_path)
         return False
 
 
@@ -242,6 +315,48 @@ def download_to_temp(filename: str, folder: str = UPLOADS_FOLDER) -> Optional[st
         return None
 
 
+def generate_download_url(filename: str, folder: str = OUTPUTS_FOLDER) -> Optional[str]:
+    """
+    Create a short-lived V4 signed URL that downloads a file as an attachment.
+
+    Args:
+        filename: Name of file in GCS
+        folder: Folder in bucket
+
+    Returns:
+        Signed URL, or None if signed downloads are disabled or signing fails
+        (callers fall back to streaming the file themselves)
+    """
+    if USE_LOCAL_STORAGE or not SIGNED_DOWNLOADS:
+        return None
+
+    client = get_client()
+    blob = client.bucket(BUCKET_NAME).blob(f"{folder}/{filename}")
+    try:
+        signing_kwargs = {}
+        credentials = get_credentials()
+        if not isinstance(credentials, Signing):
+            # Cloud Run metadata credentials can't sign locally; sign via IAM
+            # with the cached access token, fetching a new one only on expiry
+            if not credentials.valid:
+                credentials.refresh(Request())
+            signing_kwargs = {
+                'service_account_email': credentials.service_account_email,
+                'access_token': credentials.token,
+            }
+
+        return blob.generate_signed_url(
+            version='v4',
+            expiration=timedelta(minutes=SIGNED_URL_EXPIRATION_MINUTES),
+            method='GET',
+            response_disposition=f'attachment; filename="{filename}"',
+            **signing_kwargs,
+        )
+    except Exception as e:
+        logger.warning("[GCS] Failed to sign download URL for %s: %s", filename, e)
+        return None
+
+
 def list_files(folder: str = UPLOADS_FOLDER, pattern: str = None) -> List[Dict]:
     """
     List files in a GCS folder.
@@ -359,21 +474,55 @@ def download_files_for_processing(local_dir: str) -> Dict[str, Optional[str]]:
     os.makedirs(local_dir, exist_ok=True)
 
     files_info = get_uploaded_files_info()
-    local_paths = {}
+    filenames = sorted({info['name'] for info in files_info.values() if info})
+    downloaded = download_many(filenames, local_dir, UPLOADS_FOLDER)
 
+    local_paths = {}
     for file_type, info in files_info.items():
-        if info:
-            local_path = os.path.join(local_dir, info['name'])
-            if download_file(info['name'], local_path, UPLOADS_FOLDER):
-                local_paths[file_type] = local_path
-            else:
-                local_paths[file_type] = None
+        if info and info['name'] in downloaded:
+            local_paths[file_type] = os.path.join(local_dir, info['name'])
         else:
             local_paths[file_type] = None
 
     return local_paths
 
 
+def download_many(filenames: List[str], local_dir: str, folder: str = UPLOADS_FOLDER) -> set:
+    """
+    Download several files into local_dir concurrently.
+
+    Args:
+        filenames: Names of files in GCS
+        local_dir: Local directory to download to (files keep their names)
+        folder: Folder in bucket
+
+    Returns:
+        Set of filenames that were downloaded (missing files are skipped)
+    """
+    if USE_LOCAL_STORAGE:
+        return {name for name in filenames
+                if _local_download_file(name, os.path.join(local_dir, name), folder)}
+    if not filenames:
+        return set()
+
+    bucket = get_bucket()
+    pairs = [(bucket.blob(f"{folder}/{name}", chunk_size=TRANSFER_CHUNK_SIZE), os.path.join(local_dir, name))
+             for name in filenames]
+    results = transfer_manager.download_many(
+        pairs, max_workers=DOWNLOAD_WORKERS, worker_type=transfer_manager.THREAD)
+
+    downloaded = set()
+    for name, result in zip(filenames, results):
+        if isinstance(result, NotFound):
+            logger.info("[GCS] File not found: %s/%s", folder, name)
+        elif isinstance(result, Exception):
+            raise result
+        else:
+            logger.debug("[GCS] Downloaded %s to %s", name, local_dir)
+            downloaded.add(name)
+    return downloaded
+
+
 def delete_file(filename: str, folder: str = UPLOADS_FOLDER) -> bool:
     """
     Delete a file from GCS.
@@ -393,13 +542,32 @@ def delete_file(filename: str, folder: str = UPLOADS_FOLDER) -> bool:
 
     try:
         blob.delete()
-        print(f"[GCS] Deleted {blob_path}")
+        logger.info("[GCS] Deleted %s", blob_path)
         return True
     except NotFound:
-        print(f"[GCS] File not found for deletion: {blob_path}")
+        logger.info("[GCS] File not found for deletion: %s", blob_path)
         return False
 
 
+# ============== Compressed State Encoding ==============
+
+GZIP_MAGIC = b'\x1f\x8b'
+STATE_GZIP_LEVEL = 3
+
+
+def encode_state(data) -> bytes:
+    """Serialize a state dict to gzip-compressed JSON bytes."""
+    payload = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return gzip.compress(payload, compresslevel=STATE_GZIP_LEVEL)
+
+
+def decode_state(raw: bytes):
+    """Parse state bytes written by encode_state() or as plain JSON (older blobs)."""
+    if raw[:2] == GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    return orjson.loads(raw)
+
+
 # ============== Schedule State Persistence ==============
 
 SCHEDULE_STATE_FILE = 'state/current_schedule.json'
@@ -407,7 +575,7 @@ SCHEDULE_STATE_FILE = 'state/current_schedule.json'
 
 def save_schedule_state(schedule_data: dict) -> bool:
     """
-    Save the current schedule state to GCS as JSON.
+    Save the current schedule state to GCS as gzip-compressed JSON.
 
     Args:
         schedule_data: Dict with stats, reports, generated_at, and serialized orders
@@ -418,22 +586,22 @@ def save_schedule_state(schedule_data: dict) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(SCHEDULE_STATE_FILE, schedule_data)
-            print(f"[LOCAL] Saved schedule state to {SCHEDULE_STATE_FILE}")
+            logger.debug("[LOCAL] Saved schedule state to %s", SCHEDULE_STATE_FILE)
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save schedule state: {e}")
+            logger.warning("[LOCAL] Failed to save schedule state: %s", e)
             return False
 
     bucket = get_bucket()
     blob = bucket.blob(SCHEDULE_STATE_FILE)
 
     try:
-        json_data = json.dumps(schedule_data, default=str)
-        blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved schedule state to {SCHEDULE_STATE_FILE}")
+        blob.content_encoding = 'gzip'
+        blob.upload_from_string(encode_state(schedule_data), content_type='application/json')
+        logger.debug("[GCS] Saved schedule state to %s", SCHEDULE_STATE_FILE)
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save schedule state: {e}")
+        logger.warning("[GCS] Failed to save schedule state: %s", e)
         return False
 
 
@@ -448,25 +616,25 @@ def load_schedule_state() -> Optional[dict]:
         try:
             data = _local_load_json(SCHEDULE_STATE_FILE)
             if data:
-                print(f"[LOCAL] Loaded schedule state from {SCHEDULE_STATE_FILE}")
+                logger.debug("[LOCAL] Loaded schedule state from %s", SCHEDULE_STATE_FILE)
             return data
         except Exception as e:
-            print(f"[LOCAL] Failed to load schedule state: {e}")
+            logger.warning("[LOCAL] Failed to load schedule state: %s", e)
             return None
 
     bucket = get_bucket()
     blob = bucket.blob(SCHEDULE_STATE_FILE)
 
     try:
-        json_data = blob.download_as_text()
-        data = json.loads(json_data)
-        print(f"[GCS] Loaded schedule state from {SCHEDULE_STATE_FILE}")
+        # raw_download skips transcoding; decode_state handles gzip and legacy JSON
+        data = decode_state(blob.download_as_bytes(raw_download=True))
+        logger.debug("[GCS] Loaded schedule state from %s", SCHEDULE_STATE_FILE)
         return data
     except NotFound:
-        print(f"[GCS] No schedule state found")
+        logger.info("[GCS] No schedule state found")
         return None
     except Exception as e:
-        print(f"[GCS] Failed to load schedule state: {e}")
+        logger.warning("[GCS] Failed to load schedule state: %s", e)
         return None
 
 
@@ -491,10 +659,10 @@ def save_feedback(feedback_entry: dict) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(FEEDBACK_FILE, existing)
-            print(f"[LOCAL] Saved feedback ({len(existing)} total entries)")
+            logger.debug("[LOCAL] Saved feedback (%d total entries)", len(existing))
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save feedback: {e}")
+            logger.warning("[LOCAL] Failed to save feedback: %s", e)
             return False
 
     bucket = get_bucket()
@@ -503,10 +671,10 @@ def save_feedback(feedback_entry: dict) -> bool:
     try:
         json_data = json.dumps(existing, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved feedback ({len(existing)} total entries)")
+        logger.debug("[GCS] Saved feedback (%d total entries)", len(existing))
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save feedback: {e}")
+        logger.warning("[GCS] Failed to save feedback: %s", e)
         return False
 
 
@@ -534,7 +702,7 @@ def load_feedback() -> list:
     except NotFound:
         return []
     except Exception as e:
-        print(f"[GCS] Failed to load feedback: {e}")
+        logger.warning("[GCS] Failed to load feedback: %s", e)
         return []
 
 
@@ -552,12 +720,12 @@ def update_feedback_dev_status(index: int, dev_status: str, updated_by: str = 'p
     """
     valid_statuses = ['unprocessed', 'ingested', 'actioned', 'closed']
     if dev_status not in valid_statuses:
-        print(f"[Feedback] Invalid dev_status: {dev_status}")
+        logger.warning("[Feedback] Invalid dev_status: %s", dev_status)
         return False
 
     entries = load_feedback()
     if index < 0 or index >= len(entries):
-        print(f"[Feedback] Index {index} out of range")
+        logger.warning("[Feedback] Index %s out of range", index)
         return False
 
     entries[index]['dev_status'] = dev_status
@@ -569,7 +737,7 @@ def update_feedback_dev_status(index: int, dev_status: str, updated_by: str = 'p
             _local_save_json(FEEDBACK_FILE, entries)
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to update feedback dev_status: {e}")
+            logger.warning("[LOCAL] Failed to update feedback dev_status: %s", e)
             return False
 
     bucket = get_bucket()
@@ -581,7 +749,7 @@ def update_feedback_dev_status(index: int, dev_status: str, updated_by: str = 'p
         )
         return True
     except Exception as e:
-        print(f"[GCS] Failed to update feedback dev_status: {e}")
+        logger.warning("[GCS] Failed to update feedback dev_status: %s", e)
         return False
 
 
@@ -589,6 +757,43 @@ def update_feedback_dev_status(index: int, dev_status: str, updated_by: str = 'p
 
 SPECIAL_REQUESTS_FILE = 'state/special_requests.json'
 
+# Pending-request count for the planner badge, refreshed whenever requests
+# are saved here and re-read from storage at most once per TTL window
+# (another instance may have saved in the meantime)
+PENDING_COUNT_TTL_SECONDS = 5
+_pending_count_cache = {'count': None, 'expires': 0.0}
+_pending_count_lock = threading.Lock()
+
+
+# Raw special_requests.json as last read or written, reused for the same
+# TTL window so page loads and badge refreshes share one download. Each
+# load parses its own copy because callers edit the list and save it back.
+SPECIAL_REQUESTS_CACHE_TTL_SECONDS = 5
+_special_requests_cache = {'data': None, 'expires': 0.0}
+_special_requests_lock = threading.Lock()
+
+
+def _set_special_requests_cache(data: Optional[bytes]) -> None:
+    with _special_requests_lock:
+        _special_requests_cache['data'] = data
+        _special_requests_cache['expires'] = time.monotonic() + SPECIAL_REQUESTS_CACHE_TTL_SECONDS
+
+
+def _set_pending_count(requests: list) -> int:
+    count = sum(1 for r in requests if r.get('status') == 'pending')
+    with _pending_count_lock:
+        _pending_count_cache['count'] = count
+        _pending_count_cache['expires'] = time.monotonic() + PENDING_COUNT_TTL_SECONDS
+    return count
+
+
+def count_pending_special_requests() -> int:
+    """Number of special requests with status 'pending' (cached for a few seconds)."""
+    with _pending_count_lock:
+        if _pending_count_cache['count'] is not None and time.monotonic() < _pending_count_cache['expires']:
+            return _pending_count_cache['count']
+    return _set_pending_count(load_special_requests())
+
 
 def save_special_requests(requests: list) -> bool:
     """
@@ -603,10 +808,11 @@ def save_special_requests(requests: list) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(SPECIAL_REQUESTS_FILE, requests)
-            print(f"[LOCAL] Saved special requests ({len(requests)} total)")
+            _set_pending_count(requests)
+            logger.debug("[LOCAL] Saved special requests (%d total)", len(requests))
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save special requests: {e}")
+            logger.warning("[LOCAL] Failed to save special requests: %s", e)
             return False
 
     bucket = get_bucket()
@@ -615,10 +821,12 @@ def save_special_requests(requests: list) -> bool:
     try:
         json_data = json.dumps(requests, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved special requests ({len(requests)} total)")
+        _set_special_requests_cache(json_data.encode())
+        _set_pending_count(requests)
+        logger.debug("[GCS] Saved special requests (%d total)", len(requests))
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save special requests: {e}")
+        logger.warning("[GCS] Failed to save special requests: %s", e)
         return False
 
 
@@ -636,17 +844,22 @@ def load_special_requests() -> list:
         except Exception:
             return []
 
-    bucket = get_bucket()
-    blob = bucket.blob(SPECIAL_REQUESTS_FILE)
+    with _special_requests_lock:
+        raw = None
+        if time.monotonic() < _special_requests_cache['expires']:
+            raw = _special_requests_cache['data']
 
     try:
-        json_data = blob.download_as_text()
-        data = json.loads(json_data)
+        if raw is None:
+            raw = get_bucket().blob(SPECIAL_REQUESTS_FILE).download_as_bytes()
+            _set_special_requests_cache(raw)
+        data = orjson.loads(raw)
         return data if isinstance(data, list) else []
     except NotFound:
+        _set_special_requests_cache(b'[]')
         return []
     except Exception as e:
-        print(f"[GCS] Failed to load special requests: {e}")
+        logger.warning("[GCS] Failed to load special requests: %s", e)
         return []
 
 
@@ -669,10 +882,10 @@ def save_published_schedule(schedule_data: dict) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(PUBLISHED_SCHEDULE_FILE, schedule_data)
-            print(f"[LOCAL] Published schedule saved")
+            logger.info("[LOCAL] Published schedule saved")
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save published schedule: {e}")
+            logger.warning("[LOCAL] Failed to save published schedule: %s", e)
             return False
 
     bucket = get_bucket()
@@ -681,10 +894,10 @@ def save_published_schedule(schedule_data: dict) -> bool:
     try:
         json_data = json.dumps(schedule_data, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Published schedule saved")
+        logger.info("[GCS] Published schedule saved")
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save published schedule: {e}")
+        logger.warning("[GCS] Failed to save published schedule: %s", e)
         return False
 
 
@@ -699,10 +912,10 @@ def load_published_schedule() -> Optional[dict]:
         try:
             data = _local_load_json(PUBLISHED_SCHEDULE_FILE)
             if data:
-                print(f"[LOCAL] Loaded published schedule")
+                logger.debug("[LOCAL] Loaded published schedule")
             return data
         except Exception as e:
-            print(f"[LOCAL] Failed to load published schedule: {e}")
+            logger.warning("[LOCAL] Failed to load published schedule: %s", e)
             return None
 
     bucket = get_bucket()
@@ -711,13 +924,13 @@ def load_published_schedule() -> Optional[dict]:
     try:
         json_data = blob.download_as_text()
         data = json.loads(json_data)
-        print(f"[GCS] Loaded published schedule")
+        logger.debug("[GCS] Loaded published schedule")
         return data
     except NotFound:
-        print(f"[GCS] No published schedule found")
+        logger.info("[GCS] No published schedule found")
         return None
     except Exception as e:
-        print(f"[GCS] Failed to load published schedule: {e}")
+        logger.warning("[GCS] Failed to load published schedule: %s", e)
         return None
 
 
@@ -726,27 +939,39 @@ def load_published_schedule() -> Optional[dict]:
 SIMULATION_DATA_FILE = 'state/simulation_data.json'
 
 
-def save_simulation_data(sim_data: dict) -> bool:
-    """Save pre-formatted simulation data for the visual factory floor."""
+def save_simulation_data(sim_data) -> bool:
+    """Save pre-formatted simulation data for the visual factory floor.
+
+    Accepts the payload dict or its already-encoded JSON bytes. Datetimes in
+    a dict are written as ISO 8601 strings, matching what the simulation
+    endpoint serves.
+    """
+    if isinstance(sim_data, bytes):
+        json_data = sim_data
+    else:
+        json_data = orjson.dumps(sim_data, default=str)
+
     if USE_LOCAL_STORAGE:
         try:
-            _local_save_json(SIMULATION_DATA_FILE, sim_data)
-            print(f"[LOCAL] Simulation data saved")
+            full = os.path.join(os.path.abspath(LOCAL_STORAGE_DIR), SIMULATION_DATA_FILE)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, 'wb') as f:
+                f.write(json_data)
+            logger.debug("[LOCAL] Simulation data saved")
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save simulation data: {e}")
+            logger.warning("[LOCAL] Failed to save simulation data: %s", e)
             return False
 
     bucket = get_bucket()
     blob = bucket.blob(SIMULATION_DATA_FILE)
 
     try:
-        json_data = json.dumps(sim_data, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Simulation data saved")
+        logger.debug("[GCS] Simulation data saved")
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save simulation data: {e}")
+        logger.warning("[GCS] Failed to save simulation data: %s", e)
         return False
 
 
@@ -756,7 +981,7 @@ def load_simulation_data() -> Optional[dict]:
         try:
             data = _local_load_json(SIMULATION_DATA_FILE)
             if data:
-                print(f"[LOCAL] Loaded simulation data")
+                logger.debug("[LOCAL] Loaded simulation data")
             return data
         except Exception:
             return None
@@ -767,12 +992,12 @@ def load_simulation_data() -> Optional[dict]:
     try:
         json_data = blob.download_as_text()
         data = json.loads(json_data)
-        print(f"[GCS] Loaded simulation data")
+        logger.debug("[GCS] Loaded simulation data")
         return data
     except NotFound:
         return None
     except Exception as e:
-        print(f"[GCS] Failed to load simulation data: {e}")
+        logger.warning("[GCS] Failed to load simulation data: %s", e)
         return None
 
 
@@ -786,10 +1011,10 @@ def save_order_holds(holds: dict) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(ORDER_HOLDS_FILE, holds)
-            print(f"[LOCAL] Saved order holds ({len(holds)} total)")
+            logger.debug("[LOCAL] Saved order holds (%d total)", len(holds))
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save order holds: {e}")
+            logger.warning("[LOCAL] Failed to save order holds: %s", e)
             return False
 
     bucket = get_bucket()
@@ -798,10 +1023,10 @@ def save_order_holds(holds: dict) -> bool:
     try:
         json_data = json.dumps(holds, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved order holds ({len(holds)} total)")
+        logger.debug("[GCS] Saved order holds (%d total)", len(holds))
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save order holds: {e}")
+        logger.warning("[GCS] Failed to save order holds: %s", e)
         return False
 
 
@@ -824,7 +1049,7 @@ def load_order_holds() -> dict:
     except NotFound:
         return {}
     except Exception as e:
-        print(f"[GCS] Failed to load order holds: {e}")
+        logger.warning("[GCS] Failed to load order holds: %s", e)
         return {}
 
 
@@ -838,10 +1063,10 @@ def save_notifications(notifications: list) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(NOTIFICATIONS_FILE, notifications)
-            print(f"[LOCAL] Saved notifications ({len(notifications)} total)")
+            logger.debug("[LOCAL] Saved notifications (%d total)", len(notifications))
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save notifications: {e}")
+            logger.warning("[LOCAL] Failed to save notifications: %s", e)
             return False
 
     bucket = get_bucket()
@@ -850,10 +1075,10 @@ def save_notifications(notifications: list) -> bool:
     try:
         json_data = json.dumps(notifications, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved notifications ({len(notifications)} total)")
+        logger.debug("[GCS] Saved notifications (%d total)", len(notifications))
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save notifications: {e}")
+        logger.warning("[GCS] Failed to save notifications: %s", e)
         return False
 
 
@@ -876,7 +1101,7 @@ def load_notifications() -> list:
     except NotFound:
         return []
     except Exception as e:
-        print(f"[GCS] Failed to load notifications: {e}")
+        logger.warning("[GCS] Failed to load notifications: %s", e)
         return []
 
 
@@ -890,10 +1115,10 @@ def save_alerts(alerts: dict) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(ALERTS_FILE, alerts)
-            print(f"[LOCAL] Saved alerts")
+            logger.debug("[LOCAL] Saved alerts")
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save alerts: {e}")
+            logger.warning("[LOCAL] Failed to save alerts: %s", e)
             return False
 
     bucket = get_bucket()
@@ -902,10 +1127,10 @@ def save_alerts(alerts: dict) -> bool:
     try:
         json_data = json.dumps(alerts, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved alerts")
+        logger.debug("[GCS] Saved alerts")
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save alerts: {e}")
+        logger.warning("[GCS] Failed to save alerts: %s", e)
         return False
 
 
@@ -928,7 +1153,7 @@ def load_alerts() -> Optional[dict]:
     except NotFound:
         return None
     except Exception as e:
-        print(f"[GCS] Failed to load alerts: {e}")
+        logger.warning("[GCS] Failed to load alerts: %s", e)
         return None
 
 
@@ -942,10 +1167,10 @@ def save_reorder_state(reorder_data: dict) -> bool:
     if USE_LOCAL_STORAGE:
         try:
             _local_save_json(REORDER_STATE_FILE, reorder_data)
-            print(f"[LOCAL] Saved reorder state")
+            logger.debug("[LOCAL] Saved reorder state")
             return True
         except Exception as e:
-            print(f"[LOCAL] Failed to save reorder state: {e}")
+            logger.warning("[LOCAL] Failed to save reorder state: %s", e)
             return False
 
     bucket = get_bucket()
@@ -954,10 +1179,10 @@ def save_reorder_state(reorder_data: dict) -> bool:
     try:
         json_data = json.dumps(reorder_data, default=str)
         blob.upload_from_string(json_data, content_type='application/json')
-        print(f"[GCS] Saved reorder state")
+        logger.debug("[GCS] Saved reorder state")
         return True
     except Exception as e:
-        print(f"[GCS] Failed to save reorder state: {e}")
+        logger.warning("[GCS] Failed to save reorder state: %s", e)
         return False
 
 
@@ -980,7 +1205,7 @@ def load_reorder_state() -> Optional[dict]:
     except NotFound:
         return None
     except Exception as e:
-        print(f"[GCS] Failed to load reorder state: {e}")
+        logger.warning("[GCS] Failed to load reorder state: %s", e)
         return None
 
 
@@ -994,10 +1219,10 @@ def clear_reorder_state() -> bool:
     blob = bucket.blob(REORDER_STATE_FILE)
     try:
         blob.delete()
-        print(f"[GCS] Cleared reorder state")
+        logger.info("[GCS] Cleared reorder state")
         return True
     except NotFound:
         return True  # Already cleared
     except Exception as e:
-        print(f"[GCS] Failed to clear reorder state: {e}")
+        logger.warning("[GCS] Failed to clear reorder state: %s", e)
         return False
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for EstradaBot on Cloud Run.
+
+Usage:
+    gunicorn -c backend/gunicorn.conf.py backend.app:app
+
+Environment Variables:
+    - PORT: Port to bind (default: 8080)
+    - GUNICORN_THREADS: Request threads in the worker (default: 8)
+    - GUNICORN_TIMEOUT: Worker timeout in seconds (default: 120)
+    - GUNICORN_KEEPALIVE: Keep-alive seconds for idle connections (default: 5)
+
+One process, many threads: the planner workflow keeps draft schedules in
+module-level state, so a second worker would not see them. Threads release
+the GIL during GCS/network I/O, so uploads, downloads and schedule polls
+overlap while a schedule is generating.
+
+gevent is deliberately not used. The DES scheduler and Excel exports are
+CPU-bound and would stall every greenlet in the worker, and the app already
+uses native thread pools for report uploads and background persistence.
+"""
+
+import os
+
+bind = f":{os.environ.get('PORT', '8080')}"
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
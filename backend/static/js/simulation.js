@@ -89,6 +89,28 @@ class ProductionSimulation {
                 return;
             }
 
+            // Operations arrive as rows in op_fields order; payloads persisted
+            // before that still carry one object per operation
+            if (data.op_fields) {
+                const fields = data.op_fields;
+                data.parts.forEach(p => {
+                    p.operations = (p.op_rows || []).map(row =>
+                        Object.fromEntries(fields.map((field, i) => [field, row[i]])));
+                    delete p.op_rows;
+                });
+            }
+
+            // Parse each operation's times to epoch ms and sort once here;
+            // getPartPositionAtTime runs for every part on every frame
+            data.parts.forEach(p => {
+                if (!p.operations) return;
+                p.operations.forEach(op => {
+                    op.start = Date.parse(op.start);
+                    op.end = Date.parse(op.end);
+                });
+                p.operations.sort((a, b) => a.start - b.start);
+            });
+
             console.log('=== SIMULATION DATA LOADED ===');
             console.log('Total parts:', data.parts.length);
             console.log('Total stations:', data.stations.length);
@@ -323,12 +345,11 @@ class ProductionSimulation {
             return { status: 'no_ops' };  // Changed from null to track this case
         }
 
-        const ops = [...part.operations].sort((a, b) =>
-            new Date(a.start) - new Date(b.start)
-        );
+        // Sorted by start, with times as epoch ms (see loadData)
+        const ops = part.operations;
 
-        const firstOpStart = new Date(ops[0].start);
-        const lastOpEnd = new Date(ops[ops.length - 1].end);
+        const firstOpStart = ops[0].start;
+        const lastOpEnd = ops[ops.length - 1].end;
 
         // Before first operation - pending
         if (time < firstOpStart) {
@@ -343,8 +364,8 @@ class ProductionSimulation {
         // Find current operation
         for (let i = 0; i < ops.length; i++) {
             const op = ops[i];
-            const opStart = new Date(op.start);
-            const opEnd = new Date(op.end);
+            const opStart = op.start;
+            const opEnd = op.end;
 
             if (time >= opStart && time <= opEnd) {
                 const station = this.stations.find(s => s.id === op.station);
@@ -365,7 +386,7 @@ class ProductionSimulation {
             // Between operations - transitioning
             if (i < ops.length - 1) {
                 const nextOp = ops[i + 1];
-                const nextStart = new Date(nextOp.start);
+                const nextStart = nextOp.start;
 
                 if (time > opEnd && time < nextStart) {
                     const fromStation = this.stations.find(s => s.id === op.station);
@@ -5,7 +5,9 @@ Supports add, update, disable/enable, and password changes.
 """
 
 import json
+import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -17,6 +19,16 @@ import gcs_storage
 # GCS path for user data
 USERS_FILE = 'state/users.json'
 
+# Werkzeug hash method for new passwords, e.g. 'scrypt' (default) or
+# 'pbkdf2:sha256:100000'. Existing hashes keep verifying with whatever
+# parameters they were created with.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+
+
+def hash_password(password):
+    """Hash a password with the configured PASSWORD_HASH_METHOD."""
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
 
 class User(UserMixin):
     """User model for Flask-Login with persistent storage support."""
@@ -127,15 +139,47 @@ class UserStore:
             print(f"[UserStore] Failed to save users: {e}")
             return False
 
-    def seed_from_env(self, admin_username, admin_password, users_env=''):
-        """Seed users from environment variables (first-run migration)."""
+    def seed_from_env(self, admin_username, admin_password, users_env='',
+                      admin_password_hash=None):
+        """
+        Seed users from environment variables (first-run migration).
+
+        If admin_password_hash is given (a precomputed Werkzeug hash), it is
+        stored as-is and admin_password is ignored, so no KDF runs at startup.
+        """
         now = datetime.utcnow().isoformat()
 
+        # Collect (username, password, role) for users that don't exist yet
+        pending = []
+        if admin_username not in self._users and not admin_password_hash:
+            pending.append((admin_username, admin_password, 'admin'))
+        seen = set(self._users) | {admin_username}
+
+        # Parse additional users from USERS env var
+        if users_env:
+            for user_pair in users_env.split(','):
+                parts = user_pair.strip().split(':')
+                if len(parts) >= 2:
+                    username = parts[0].strip()
+                    password = parts[1].strip()
+                    role = parts[2].strip().lower() if len(parts) > 2 else 'guest'
+                    if username and username not in seen:
+                        seen.add(username)
+                        pending.append((username, password, role))
+
+        # The KDF is deliberately slow but releases the GIL, so hash in parallel
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+                hashes = list(pool.map(hash_password, [p[1] for p in pending]))
+        else:
+            hashes = [hash_password(p[1]) for p in pending]
+        hashed = {username: h for (username, _, _), h in zip(pending, hashes)}
+
         # Always ensure admin exists
         if admin_username not in self._users:
             self._users[admin_username] = User(
                 username=admin_username,
-                password_hash=generate_password_hash(admin_password),
+                password_hash=admin_password_hash or hashed[admin_username],
                 role='admin',
                 active=True,
                 created_at=now,
@@ -143,24 +187,18 @@ class UserStore:
             )
             print(f"[UserStore] Seeded admin user: {admin_username}")
 
-        # Parse additional users from USERS env var
-        if users_env:
-            for user_pair in users_env.split(','):
-                parts = user_pair.strip().split(':')
-                if len(parts) >= 2:
-                    username = parts[0].strip()
-                    password = parts[1].strip()
-                    role = parts[2].strip().lower() if len(parts) > 2 else 'guest'
-                    if username and username not in self._users:
-                        self._users[username] = User(
-                            username=username,
-                            password_hash=generate_password_hash(password),
-                            role=role,
-                            active=True,
-                            created_at=now,
-                            updated_at=now,
-                        )
-                        print(f"[UserStore] Seeded user from env: {username} ({role})")
+        for username, _, role in pending:
+            if username == admin_username:
+                continue
+            self._users[username] = User(
+                username=username,
+                password_hash=hashed[username],
+                role=role,
+                active=True,
+                created_at=now,
+                updated_at=now,
+            )
+            print(f"[UserStore] Seeded user from env: {username} ({role})")
 
         self.save()
 
@@ -198,7 +236,7 @@ class UserStore:
         with self._lock:
             self._users[username] = User(
                 username=username,
-                password_hash=generate_password_hash(password),
+                password_hash=hash_password(password),
                 role=role,
                 active=True,
                 created_at=now,
@@ -256,7 +294,7 @@ class UserStore:
             return False, 'Password must be at least 6 characters.'
 
         with self._lock:
-            self._users[username].password_hash = generate_password_hash(new_password)
+            self._users[username].password_hash = hash_password(new_password)
             self._users[username].updated_at = datetime.utcnow().isoformat()
         self.save()
         return True, 'Password has been reset.'
@@ -272,7 +310,7 @@ class UserStore:
             return False, 'New password must be at least 6 characters.'
 
         with self._lock:
-            user.password_hash = generate_password_hash(new_password)
+            user.password_hash = hash_password(new_password)
             user.updated_at = datetime.utcnow().isoformat()
         self.save()
         return True, 'Password changed successfully.'
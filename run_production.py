@@ -47,28 +47,35 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Verify required settings
-if os.environ.get('SECRET_KEY', '').startswith('dev-') or not os.environ.get('SECRET_KEY'):
-    print("=" * 60)
-    print("WARNING: No SECRET_KEY set in environment!")
-    print("Please set a random SECRET_KEY in your .env file.")
-    print("Generate one with: python -c \"import secrets; print(secrets.token_hex(32))\"")
-    print("=" * 60)
-    sys.exit(1)
-
-if os.environ.get('ADMIN_PASSWORD', 'admin') == 'admin':
-    print("=" * 60)
-    print("WARNING: Using default admin password!")
-    print("Please set ADMIN_PASSWORD in your .env file.")
-    print("=" * 60)
-    # Don't exit, but warn
-
-# Set production environment
-os.environ['FLASK_ENV'] = 'production'
-os.environ['FLASK_DEBUG'] = 'false'
-
-# Import and run
-from app import app, run_production
 
-if __name__ == '__main__':
+def main():
+    """Check settings, then import the app and serve it."""
+    # Verify required settings
+    if os.environ.get('SECRET_KEY', '').startswith('dev-') or not os.environ.get('SECRET_KEY'):
+        print("=" * 60)
+        print("WARNING: No SECRET_KEY set in environment!")
+        print("Please set a random SECRET_KEY in your .env file.")
+        print("Generate one with: python -c \"import secrets; print(secrets.token_hex(32))\"")
+        print("=" * 60)
+        sys.exit(1)
+
+    if os.environ.get('ADMIN_PASSWORD', 'admin') == 'admin':
+        print("=" * 60)
+        print("WARNING: Using default admin password!")
+        print("Please set ADMIN_PASSWORD in your .env file.")
+        print("=" * 60)
+        # Don't exit, but warn
+
+    # Set production environment
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ['FLASK_DEBUG'] = 'false'
+
+    # Import and run
+    from app import run_production
     run_production()
+
+
+# Spawned DES worker processes re-run this file as __mp_main__; the guard keeps
+# them from importing the app (and its startup GCS reads) or starting a server.
+if __name__ == '__main__':
+    main()
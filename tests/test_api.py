@@ -1,5 +1,7 @@
 """Tests for Flask API endpoints."""
 
+import os
+
 import pytest
 import json
 
@@ -31,6 +33,41 @@ class TestAuthEndpoints:
         assert response.status_code in (302, 401)
 
 
+class TestApiTokens:
+    """Tests for bearer-token authentication."""
+
+    def test_issue_and_use_token(self, app, auth_client):
+        response = auth_client.post('/api/auth/token')
+        assert response.status_code == 200
+        token = response.get_json()['token']
+
+        fresh = app.test_client()
+        response = fresh.get('/api/notifications',
+                             headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+
+    def test_invalid_token_rejected(self, client):
+        response = client.get('/api/notifications',
+                              headers={'Authorization': 'Bearer not-a-token'})
+        assert response.status_code in (302, 401)
+
+    def test_token_revoked_by_password_change(self, app):
+        import app as app_module
+        from user_store import User
+
+        user = User('token-user', 'hash-one', role='guest')
+        token = app_module.issue_api_token(user)
+        app_module.user_store._users['token-user'] = user
+        try:
+            class Req:
+                headers = {'Authorization': f'Bearer {token}'}
+            assert app_module.load_user_from_token(Req()) is user
+            user.password_hash = 'hash-two'
+            assert app_module.load_user_from_token(Req()) is None
+        finally:
+            del app_module.user_store._users['token-user']
+
+
 class TestFeedbackEndpoints:
     """Tests for feedback API."""
 
@@ -312,3 +349,1020 @@ class TestFileHotListEndpoint:
         """Unauthenticated access should be redirected."""
         response = client.get('/api/planner/file-hot-list')
         assert response.status_code in (302, 401)
+
+
+class TestImpactPreview:
+    """Tests for POST /api/special-requests/impact-preview."""
+
+    def test_reuses_simulated_baseline(self, auth_client, monkeypatch):
+        from datetime import datetime
+        from types import SimpleNamespace
+        import app as app_module
+
+        def order(wo, hour, on_time=True):
+            return SimpleNamespace(wo_number=wo, part_number='PN', customer='Acme',
+                                   blast_date=datetime(2026, 2, 16, hour), on_time=on_time)
+
+        loader = SimpleNamespace(orders=[{'wo_number': 'WO-A'}], hot_list_entries=[])
+        monkeypatch.setitem(app_module.planner_state, 'loader', loader)
+        monkeypatch.setitem(app_module.planner_state, 'base_scenario', '4day_12h')
+        monkeypatch.setitem(app_module.planner_state, 'scenarios', {
+            '4day_12h': {'baseline_orders': [order('WO-A', 6)]}})
+        monkeypatch.setattr(app_module.gcs_storage, 'load_published_schedule', lambda: None)
+
+        submitted = []
+
+        def fake_submit(loader, working_days, shift_hours, day_configs=None, hot_list_entries=None):
+            submitted.append(hot_list_entries)
+            return {'result': ([order('WO-NEW', 6), order('WO-A', 10, on_time=False)], [], [])}
+
+        monkeypatch.setattr(app_module, '_submit_des_run', fake_submit)
+
+        response = auth_client.post('/api/special-requests/impact-preview',
+                                    json={'wo_number': 'WO-NEW', 'is_asap': True})
+        data = response.get_json()
+        assert response.status_code == 200
+        # Only the with-request pass runs; the baseline comes from the scenario
+        assert len(submitted) == 1 and submitted[0][0]['wo_number'] == 'WO-NEW'
+        assert data['impact']['total_delayed'] == 1
+        assert data['impact']['orders_now_late'] == 1
+
+    def test_uses_published_scenario_without_base_scenario(self, auth_client, monkeypatch):
+        from datetime import datetime
+        from types import SimpleNamespace
+        import app as app_module
+
+        loader = SimpleNamespace(orders=[{'wo_number': 'WO-A'}], hot_list_entries=[])
+        monkeypatch.setitem(app_module.planner_state, 'loader', loader)
+        monkeypatch.setitem(app_module.planner_state, 'base_scenario', None)
+        monkeypatch.setitem(app_module.planner_state, 'scenarios', {})
+        monkeypatch.setitem(app_module.published_schedule, 'schedule_data',
+                            {'scenario_key': '5day_12h', 'orders': []})
+
+        submitted = []
+
+        def fake_submit(loader, working_days, shift_hours, day_configs=None, hot_list_entries=None):
+            submitted.append(working_days)
+            return {'result': ([SimpleNamespace(wo_number='WO-A', part_number='PN', customer='Acme',
+                                                blast_date=datetime(2026, 2, 16, 6), on_time=True)],
+                               [], [])}
+
+        monkeypatch.setattr(app_module, '_submit_des_run', fake_submit)
+
+        response = auth_client.post('/api/special-requests/impact-preview',
+                                    json={'wo_number': 'WO-NEW', 'is_asap': True})
+        assert response.status_code == 200
+        assert response.get_json()['has_published_schedule'] is True
+        # Both passes use the published schedule's scenario
+        assert submitted == [app_module.SCENARIO_CONFIGS['5day_12h']['working_days']] * 2
+
+    def test_simulated_baseline_only_for_presets_on_planner_loader(self, app, monkeypatch):
+        import app as app_module
+
+        loader = object()
+        baseline = ['baseline']
+        monkeypatch.setitem(app_module.planner_state, 'loader', loader)
+        monkeypatch.setitem(app_module.planner_state, 'scenarios', {
+            '4day_12h': {'baseline_orders': baseline},
+            'custom': {'baseline_orders': ['custom']},
+        })
+        assert app_module._simulated_baseline('4day_12h', loader) is baseline
+        assert app_module._simulated_baseline('4day_12h', object()) is None
+        assert app_module._simulated_baseline('custom', loader) is None
+        assert app_module._simulated_baseline('5day_12h', loader) is None
+
+
+class TestBaseScheduleLookup:
+    """Tests for the cached WO# lookup on the base schedule."""
+
+    def test_built_once_per_scenario(self, app):
+        from types import SimpleNamespace
+        import app as app_module
+
+        scenario = {'orders': [SimpleNamespace(wo_number='WO-1'), SimpleNamespace(wo_number='WO-2')]}
+        lookup = app_module._base_schedule_lookup(scenario)
+        assert set(lookup) == {'WO-1', 'WO-2'}
+        assert app_module._base_schedule_lookup(scenario) is lookup
+
+
+class TestSalesOrderUpload:
+    """Tests for sales order scrubbing on POST /api/upload."""
+
+    def _workbook_bytes(self, sheets):
+        import io
+        import openpyxl
+
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for title, rows in sheets.items():
+            ws = wb.create_sheet(title)
+            for row in rows:
+                ws.append(row)
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        return buf
+
+    def test_scrubs_sensitive_columns_and_extra_sheets(self, auth_client):
+        """Uploaded OSO should keep only RawData without price/address columns."""
+        import openpyxl
+        import gcs_storage
+
+        upload = self._workbook_bytes({
+            'Summary': [['ignore me']],
+            'OSO': [
+                ['Sales Order', 'Unit Price', 'Material', 'Customer Address'],
+                ['SO-1', 125.0, 'PN-100', '1 Main St'],
+                ['SO-2', 99.5, 'PN-200', '2 Side St'],
+            ],
+        })
+        response = auth_client.post('/api/upload', data={
+            'file': (upload, 'OSO_scrub_test.xlsx'),
+            'type': 'sales_order',
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+
+        stored = os.path.join(gcs_storage.LOCAL_STORAGE_DIR, gcs_storage.UPLOADS_FOLDER,
+                              'OSO_scrub_test.xlsx')
+        wb = openpyxl.load_workbook(stored)
+        try:
+            assert wb.sheetnames == ['RawData']
+            rows = list(wb['RawData'].iter_rows(values_only=True))
+        finally:
+            wb.close()
+            os.unlink(stored)
+        assert rows == [
+            ('Sales Order', 'Material'),
+            ('SO-1', 'PN-100'),
+            ('SO-2', 'PN-200'),
+        ]
+
+    def test_clean_workbook_uploaded_unchanged(self, auth_client):
+        """A lone RawData sheet with no sensitive headers is stored byte-for-byte."""
+        import gcs_storage
+
+        upload = self._workbook_bytes({
+            'RawData': [['Sales Order', 'Material'], ['SO-1', 'PN-100']],
+        })
+        original = upload.getvalue()
+        response = auth_client.post('/api/upload', data={
+            'file': (upload, 'OSO_clean_test.xlsx'),
+            'type': 'sales_order',
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+
+        stored = os.path.join(gcs_storage.LOCAL_STORAGE_DIR, gcs_storage.UPLOADS_FOLDER,
+                              'OSO_clean_test.xlsx')
+        with open(stored, 'rb') as f:
+            assert f.read() == original
+        os.unlink(stored)
+
+    def test_rejects_workbook_without_oso_sheet(self, auth_client):
+        upload = self._workbook_bytes({'Other': [['a', 'b']]})
+        response = auth_client.post('/api/upload', data={
+            'file': (upload, 'OSO_bad.xlsx'),
+            'type': 'sales_order',
+        }, content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert 'RawData' in response.get_json()['error']
+
+
+class TestCombinedUpload:
+    """Tests for splitting a combined OSO+SDR upload."""
+
+    def test_splits_and_scrubs_sheets(self, auth_client):
+        import openpyxl
+        import gcs_storage
+
+        upload = TestSalesOrderUpload()._workbook_bytes({
+            'OSO': [
+                ['Work Order', 'Net Price', 'Material'],
+                ['3000000001', 10.0, 'PN-100'],
+            ],
+            'Dispatch Report': [
+                ['Order', 'Material', 'Curr.WC'],
+                ['3000000002', 'PN-200', 'BLAST'],
+            ],
+        })
+        response = auth_client.post('/api/upload', data={
+            'file': (upload, 'Combined_test.xlsx'),
+            'type': 'combined_report',
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+        assert len(response.get_json()['split_into']) == 2
+
+        folder = os.path.join(gcs_storage.LOCAL_STORAGE_DIR, gcs_storage.UPLOADS_FOLDER)
+        sheets = {}
+        for name in ('OSO_Combined_test.xlsx', 'SDR_Combined_test.xlsx'):
+            path = os.path.join(folder, name)
+            wb = openpyxl.load_workbook(path)
+            try:
+                sheets[name] = (wb.sheetnames, list(wb.active.iter_rows(values_only=True)))
+            finally:
+                wb.close()
+                os.unlink(path)
+
+        assert sheets['OSO_Combined_test.xlsx'] == (
+            ['RawData'], [('Work Order', 'Material'), ('3000000001', 'PN-100')])
+        assert sheets['SDR_Combined_test.xlsx'] == (
+            ['Dispatch Report'], [('Order', 'Material', 'Curr.WC'), ('3000000002', 'PN-200', 'BLAST')])
+
+
+class TestApproveRequests:
+    """Tests for POST /api/planner/approve-requests."""
+
+    def test_records_decisions_and_skips_unknown_statuses(self, auth_client, monkeypatch):
+        import app as app_module
+
+        stored = [{'id': 'SR-1', 'status': 'pending'}, {'id': 'SR-2', 'status': 'pending'},
+                  {'id': 'SR-3', 'status': 'pending'}]
+        saved = []
+        monkeypatch.setattr(app_module.gcs_storage, 'load_special_requests', lambda: stored)
+        monkeypatch.setattr(app_module.gcs_storage, 'save_special_requests', saved.append)
+
+        response = auth_client.post('/api/planner/approve-requests', json={
+            'approvals': {'SR-1': 'approved', 'SR-2': 'rejected', 'SR-3': 'maybe'},
+            'rejection_reason': 'No capacity',
+        })
+        assert response.get_json()['updated'] == 2
+        assert [r['status'] for r in stored] == ['approved', 'rejected', 'pending']
+        assert stored[0]['reviewed_by'] == 'admin'
+        assert stored[1]['rejection_reason'] == 'No capacity'
+        assert saved == [stored]
+
+        # Nothing changed, nothing written
+        auth_client.post('/api/planner/approve-requests', json={'approvals': {'SR-9': 'approved'}})
+        assert len(saved) == 1
+
+
+class TestPublishSchedule:
+    """Tests for POST /api/planner/publish."""
+
+    def _setup(self, monkeypatch, save_result=True):
+        import app as app_module
+
+        monkeypatch.setitem(app_module.planner_state, 'final_schedule', {
+            'orders': [], 'serialized_orders': [{'wo_number': 'WO-PUB-1', 'on_time_status': 'Late'}],
+            'reports': {}, 'stats': {'total_orders': 1},
+            'scenario_key': '4day', 'scenario_label': '4-Day', 'approved_request_count': 1,
+        })
+        monkeypatch.setitem(app_module.published_schedule, 'schedule_data', None)
+        monkeypatch.setattr(app_module, 'current_schedule', dict(app_module.current_schedule))
+        stored = [{'id': 'SR-1', 'status': 'approved'}, {'id': 'SR-2', 'status': 'rejected'}]
+        writes = {}
+        monkeypatch.setattr(app_module.gcs_storage, 'load_special_requests', lambda: stored)
+        monkeypatch.setattr(app_module.gcs_storage, 'load_published_schedule', lambda: None)
+        for name in ('save_schedule_state', 'save_published_schedule',
+                     'save_special_requests', 'save_alerts'):
+            def save(data, name=name):
+                writes[name] = data
+                return save_result or name == 'save_special_requests'
+            monkeypatch.setattr(app_module.gcs_storage, name, save)
+        return stored, writes
+
+    def test_persists_state_and_marks_approved_requests(self, auth_client, monkeypatch):
+        import app as app_module
+
+        stored, writes = self._setup(monkeypatch)
+
+        response = auth_client.post('/api/planner/publish')
+        assert response.get_json()['success'] is True
+        assert [r['status'] for r in stored] == ['published', 'rejected']
+        assert writes['save_special_requests'] is stored
+        # Both state files are stored before the response
+        assert writes['save_published_schedule']['scenario_key'] == '4day'
+        # The in-memory copy is the stored payload itself
+        assert app_module.published_schedule['schedule_data'] is writes['save_published_schedule']
+        assert '4day' in writes['save_schedule_state']['modes']
+        assert app_module.planner_state['final_schedule'] is None
+
+        # Readers use the in-memory published schedule, not a stale GCS copy
+        response = auth_client.post('/api/alerts/generate')
+        assert response.status_code == 200
+        assert writes['save_alerts']['summary']['late_count'] == 1
+
+    def test_failed_save_publishes_nothing(self, auth_client, monkeypatch):
+        import app as app_module
+
+        stored, writes = self._setup(monkeypatch, save_result=False)
+
+        response = auth_client.post('/api/planner/publish')
+        assert response.status_code == 500
+        assert [r['status'] for r in stored] == ['approved', 'rejected']
+        assert 'save_special_requests' not in writes
+        assert app_module.published_schedule['schedule_data'] is None
+        assert app_module.planner_state['final_schedule'] is not None
+
+
+class TestFinalScheduleFingerprint:
+    """Tests for the hash that lets generate-final skip unchanged exports."""
+
+    def test_changes_with_any_report_input(self, app):
+        from datetime import datetime
+        import app as app_module
+
+        config = {'working_days': [0, 1, 2, 3], 'shift_hours': 12, 'label': '4-Day'}
+        orders = [{'wo_number': 'WO-1', 'blast_date': '2026-02-16T06:00:00'}]
+        unscheduled = [{'wo_number': 'WO-2'}]
+        hot_list = [{'wo_number': 'WO-1', 'need_by_date': datetime(2026, 2, 20)}]
+
+        fingerprint = app_module._final_schedule_fingerprint(config, orders, unscheduled, hot_list)
+        assert fingerprint == app_module._final_schedule_fingerprint(
+            dict(config), list(orders), list(unscheduled), list(hot_list))
+        assert fingerprint != app_module._final_schedule_fingerprint(config, orders, unscheduled, [])
+        assert fingerprint != app_module._final_schedule_fingerprint(config, orders, [], hot_list)
+        assert fingerprint != app_module._final_schedule_fingerprint(
+            {**config, 'shift_hours': 10}, orders, unscheduled, hot_list)
+
+
+class TestReconcileSpecialRequests:
+    """Tests for matching Mode B special requests against an uploaded file."""
+
+    def test_matches_from_uploaded_workbook_only(self, app, monkeypatch, caplog):
+        import logging
+        import app as app_module
+        import gcs_storage
+
+        upload = TestSalesOrderUpload()._workbook_bytes({
+            'Summary': [['ignore me']],
+            'RawData': [
+                ['Work Order', 'Material', 'Customer Name', 'Material Description'],
+                [3000000001.0, 'PN-100', 'Acme', 'Stator A'],
+                [3000000002, 'PN-200', 'Other Co', 'Stator B'],
+            ],
+        })
+        requests_data = [
+            {'id': 'SR-1', 'wo_number': '3000000001', 'matched': False, 'status': 'pending',
+             'part_number': 'PN-100', 'customer': 'acme'},
+            {'id': 'SR-2', 'wo_number': '3000000002', 'matched': False, 'status': 'pending',
+             'part_number': 'PN-999'},
+            {'id': 'SR-3', 'wo_number': '3000000003', 'matched': False, 'status': 'pending'},
+            {'id': 'SR-0', 'wo_number': '3000000009', 'matched': True, 'status': 'pending',
+             'matched_at': '2026-01-01T00:00:00', 'needs_review': True},
+        ]
+        saved = []
+        notifications = []
+        monkeypatch.setattr(gcs_storage, 'load_special_requests', lambda: requests_data)
+        monkeypatch.setattr(gcs_storage, 'save_special_requests', saved.append)
+        monkeypatch.setattr(gcs_storage, 'download_files_for_processing',
+                            lambda d: pytest.fail('should not download all inputs'))
+        monkeypatch.setattr(app_module, 'create_notification',
+                            lambda kind, msg, **k: notifications.append(msg))
+
+        with caplog.at_level(logging.INFO, logger='app'):
+            assert app_module._reconcile_special_requests('OSO_test.xlsx', upload) == 2
+        assert saved
+        assert '[Reconcile] 2 request(s) matched from upload of OSO_test.xlsx' in caplog.text
+        # Only this upload's mismatches are counted, not earlier matches
+        assert notifications == ['2 Mode B request(s) matched to uploaded data '
+                                 '(1 with data mismatches — review needed)']
+        first, second, third, _ = requests_data
+        assert first['needs_review'] is False
+        assert first['matched_order_data']['description'] == 'Stator A'
+        assert second['needs_review'] is True
+        assert second['data_mismatches'][0]['actual'] == 'PN-200'
+        assert third['matched'] is False
+
+
+class TestJsonProvider:
+    """Tests for the orjson-backed JSON provider."""
+
+    def test_dumps_datetimes_and_int_keys(self, app):
+        from datetime import datetime
+
+        with app.app_context():
+            out = app.json.dumps({'at': datetime(2026, 2, 16, 8, 30, 0, 120), 1: 'x'})
+        assert app.json.loads(out) == {'at': '2026-02-16T08:30:00.000120', '1': 'x'}
+
+    def test_datetime_subclasses_use_iso_format(self, app):
+        from datetime import datetime
+        import pandas as pd
+
+        with app.app_context():
+            out = app.json.dumps({'t': pd.Timestamp('2026-01-02 03:04:00'),
+                                  'd': datetime(2026, 1, 2, 3, 4)})
+            body = app.json.response({'t': pd.Timestamp('2026-01-02 03:04:00')}).get_json()
+        assert app.json.loads(out) == {'t': '2026-01-02T03:04:00', 'd': '2026-01-02T03:04:00'}
+        assert body == {'t': '2026-01-02T03:04:00'}
+
+    def test_response_is_json(self, app):
+        with app.app_context():
+            response = app.json.response({'ok': True})
+        assert response.mimetype == 'application/json'
+        assert response.get_json() == {'ok': True}
+
+    def test_api_not_found_is_json(self, auth_client):
+        response = auth_client.get('/api/does-not-exist')
+        assert response.status_code == 404
+        assert response.mimetype == 'application/json'
+        assert response.get_json() == {'error': 'Not found'}
+
+
+class TestReportTypeClassification:
+    """Tests for filename -> report type classification."""
+
+    @pytest.mark.parametrize('filename,expected', [
+        ('Master_Schedule_4Day_20260101_0800.xlsx', 'Master Schedule'),
+        ('BLAST_Schedule_5Day_20260101_0800.xlsx', 'BLAST Schedule'),
+        ('Core_Oven_Schedule_4Day.xlsx', 'Core Oven Schedule'),
+        ('Core_Schedule_4Day.xlsx', 'Core Oven Schedule'),
+        ('Pending_Core_Report_4Day.xlsx', 'Pending Core Report'),
+        ('Impact_Analysis_20260101_0800.xlsx', 'Impact Analysis'),
+        ('Resource_Utilization_4Day.xlsx', 'Resource Utilization'),
+        ('Something_Else.xlsx', 'Unknown'),
+    ])
+    def test_get_report_type(self, app, filename, expected):
+        import app as app_module
+        assert app_module.get_report_type(filename) == expected
+
+
+class TestReportsCache:
+    """Tests for the short-lived report listing cache."""
+
+    def test_listing_cached_until_invalidated(self, app, monkeypatch):
+        from datetime import datetime
+        import app as app_module
+        import gcs_storage
+
+        calls = []
+
+        def fake_list_files(folder):
+            calls.append(folder)
+            return [{'name': 'Master_Schedule_4Day_20260101.xlsx',
+                     'modified': datetime(2026, 1, 1), 'size': 10}]
+
+        monkeypatch.setattr(gcs_storage, 'list_files', fake_list_files)
+        app_module.invalidate_reports_cache()
+
+        first = app_module.get_available_reports()
+        second = app_module.get_available_reports()
+        assert len(calls) == 1
+        assert first == second
+        assert first[0]['type'] == 'Master Schedule'
+
+        app_module.invalidate_reports_cache()
+        app_module.get_available_reports()
+        assert len(calls) == 2
+        app_module.invalidate_reports_cache()
+
+    def test_api_reports_does_not_mutate_cache(self, auth_client, monkeypatch):
+        from datetime import datetime
+        import app as app_module
+        import gcs_storage
+
+        monkeypatch.setattr(gcs_storage, 'list_files', lambda folder: [
+            {'name': 'BLAST_Schedule_4Day_20260101.xlsx',
+             'modified': datetime(2026, 1, 1, 8, 30), 'size': 10}])
+        app_module.invalidate_reports_cache()
+
+        response = auth_client.get('/api/reports')
+        assert response.get_json()[0]['modified'] == '2026-01-01T08:30:00'
+        assert isinstance(app_module.get_available_reports()[0]['modified'], datetime)
+        app_module.invalidate_reports_cache()
+
+
+class TestUploadedFilesCache:
+    """Tests for the short-lived uploaded-file listing cache."""
+
+    def test_listing_cached_until_invalidated(self, app, monkeypatch):
+        import app as app_module
+        import gcs_storage
+
+        calls = []
+
+        def fake_files_info():
+            calls.append(1)
+            return {'sales_order': {'filename': 'OSO.xlsx'}, 'shop_dispatch': None}
+
+        monkeypatch.setattr(gcs_storage, 'get_uploaded_files_info', fake_files_info)
+        app_module.invalidate_uploaded_files_cache()
+
+        first = app_module.get_uploaded_files()
+        second = app_module.get_uploaded_files()
+        assert len(calls) == 1
+        assert first == second
+        assert first['sales_order']['filename'] == 'OSO.xlsx'
+
+        app_module.invalidate_uploaded_files_cache()
+        app_module.get_uploaded_files()
+        assert len(calls) == 2
+        app_module.invalidate_uploaded_files_cache()
+
+    def test_upload_invalidates_listing(self, auth_client, monkeypatch):
+        import io
+        import app as app_module
+        import gcs_storage
+
+        monkeypatch.setattr(gcs_storage, 'upload_file_object', lambda f, name: None)
+        monkeypatch.setattr(app_module, '_reconcile_special_requests', lambda name, kind: 0)
+        with app_module._uploaded_files_cache_lock:
+            app_module._uploaded_files_cache['files'] = {'hot_list': None}
+            app_module._uploaded_files_cache['expires'] = float('inf')
+
+        response = auth_client.post('/api/upload', data={
+            'file': (io.BytesIO(b'data'), 'Hot_List.xlsx'),
+            'type': 'hot_list',
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+        assert app_module._uploaded_files_cache['files'] is None
+
+
+class TestGenerateJob:
+    """Tests for background schedule generation."""
+
+    def test_generate_returns_job_and_status_reports_result(self, auth_client, monkeypatch):
+        import app as app_module
+        import gcs_storage
+
+        def fake_run(job, username):
+            job['stage'] = 'Running 4-day schedule'
+            job['result'] = {'stats': {'total_orders': 3}, 'stats_5day': {'total_orders': 4},
+                             'reports': {}}
+
+        monkeypatch.setattr(gcs_storage, 'load_reorder_state', lambda: None)
+        monkeypatch.setattr(app_module, '_run_generate_job', fake_run)
+
+        response = auth_client.post('/api/generate', json={})
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        app_module._generate_pool.submit(lambda: None).result()  # wait for the job
+
+        data = auth_client.get(f'/api/generate/status/{job_id}').get_json()
+        assert data['status'] == 'done'
+        assert data['success'] is True
+        assert data['stats_5day'] == {'total_orders': 4}
+
+    def test_failed_job_reports_error(self, auth_client, monkeypatch):
+        import app as app_module
+        import gcs_storage
+
+        def fake_run(job, username):
+            job['error'] = 'No orders loaded. Please upload a Sales Order file.'
+
+        monkeypatch.setattr(gcs_storage, 'load_reorder_state', lambda: None)
+        monkeypatch.setattr(app_module, '_run_generate_job', fake_run)
+
+        job_id = auth_client.post('/api/generate', json={}).get_json()['job_id']
+        app_module._generate_pool.submit(lambda: None).result()
+
+        data = auth_client.get(f'/api/generate/status/{job_id}').get_json()
+        assert data['status'] == 'error'
+        assert 'No orders loaded' in data['error']
+
+    def test_unknown_job(self, auth_client):
+        response = auth_client.get('/api/generate/status/nope')
+        assert response.status_code == 404
+
+
+class TestPersistedScheduleState:
+    """Tests for reading the persisted schedule state."""
+
+    def test_load_resolves_active_mode_without_top_level_copy(self, app, monkeypatch):
+        import app as app_module
+        import gcs_storage
+
+        orders_5day = [{'wo_number': 'WO-5'}]
+        state = {
+            'generated_at': '2026-02-16T08:00:00',
+            'published_by': 'planner',
+            'active_mode': '5day',
+            'modes': {
+                '4day': {'orders': [{'wo_number': 'WO-4'}], 'stats': {'total_orders': 1}, 'reports': {}},
+                '5day': {'orders': orders_5day, 'stats': {'total_orders': 2}, 'reports': {'master': 'm.xlsx'}},
+            },
+        }
+        monkeypatch.setattr(gcs_storage, 'load_schedule_state', lambda: state)
+        monkeypatch.setattr(gcs_storage, 'load_published_schedule', lambda: None)
+        monkeypatch.setattr(app_module, 'current_schedule', {})
+
+        app_module.load_persisted_schedule()
+        loaded = app_module.current_schedule
+        assert loaded['active_mode'] == '5day'
+        assert loaded['serialized_orders'] is orders_5day
+        assert loaded['modes']['5day']['serialized_orders'] is orders_5day
+        assert loaded['stats'] == {'total_orders': 2}
+        assert loaded['reports'] == {'master': 'm.xlsx'}
+
+    def test_legacy_single_mode_state(self, app):
+        import app as app_module
+
+        state = {'orders': [{'wo_number': 'WO-1'}], 'stats': {}, 'reports': {}}
+        assert app_module._persisted_active_mode(state)['orders'] == [{'wo_number': 'WO-1'}]
+
+
+class TestScheduleEndpoint:
+    """Tests for GET /api/schedule."""
+
+    def test_serves_serialized_orders_in_api_format(self, auth_client, monkeypatch):
+        from datetime import datetime
+        import app as app_module
+
+        mode_data = {
+            'serialized_orders': [{
+                'wo_number': 'WO-API-1',
+                'serial_number': None,
+                'part_number': 'PN-1',
+                'description': 'Stator',
+                'customer': 'Acme',
+                'assigned_core': 'C-12',
+                'rubber_type': 'XE',
+                'priority': 'Normal',
+                'blast_date': '2026-02-16T06:00:00',
+                'completion_date': None,
+                'promise_date': '2026-03-01T00:00:00',
+                'turnaround_days': None,
+                'on_time_status': 'At Risk',
+                'is_reline': True,
+                'special_instructions': None,
+                'supermarket_location': None,
+            }],
+            'stats': {'total_orders': 1, 'at_risk': 1},
+        }
+        monkeypatch.setattr(app_module, 'current_schedule', {
+            'generated_at': datetime(2026, 2, 15, 12, 0),
+            'published_by': 'admin',
+            'active_mode': '4day',
+            'modes': {'4day': mode_data},
+        })
+        monkeypatch.setattr(app_module.gcs_storage, 'load_reorder_state', lambda: None)
+
+        data = auth_client.get('/api/schedule?mode=4day').get_json()
+        order = data['orders'][0]
+        assert order['core'] == 'C-12'
+        assert order['is_rework'] is True
+        assert order['serial_number'] == ''
+        assert order['completion_date'] == ''
+        assert order['turnaround_days'] == ''
+        assert data['stats']['at_risk'] == 1
+        assert data['has_modes'] is True
+
+        # The API mapping is built once and reused on later polls
+        assert mode_data['api_orders'] is app_module._api_orders(mode_data)
+
+    def test_etag_revalidation(self, auth_client, monkeypatch):
+        from datetime import datetime
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'current_schedule', {
+            'generated_at': datetime(2026, 2, 15, 12, 0),
+            'published_by': 'admin',
+            'active_mode': '4day',
+            'modes': {'4day': {
+                'serialized_orders': [{'wo_number': 'WO-ETAG-1', 'on_time_status': 'On Time'},
+                                      {'wo_number': 'WO-ETAG-2', 'on_time_status': 'Late'}],
+                'stats': {'total_orders': 2},
+            }},
+        })
+        reorder = {'state': None}
+        monkeypatch.setattr(app_module.gcs_storage, 'load_reorder_state', lambda: reorder['state'])
+
+        first = auth_client.get('/api/schedule')
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+
+        again = auth_client.get('/api/schedule', headers={'If-None-Match': etag})
+        assert again.status_code == 304
+
+        # A reorder changes the body and therefore the ETag
+        reorder['state'] = {'mode': '4day', 'sequence': ['WO-ETAG-2', 'WO-ETAG-1'],
+                            'created_at': '2026-02-15T13:00:00'}
+        reordered = auth_client.get('/api/schedule', headers={'If-None-Match': etag})
+        assert reordered.status_code == 200
+        assert reordered.headers['ETag'] != etag
+        data = reordered.get_json()
+        assert data['has_reorder'] is True
+        assert [o['wo_number'] for o in data['orders']] == ['WO-ETAG-2', 'WO-ETAG-1']
+
+    def test_ndjson_stream(self, auth_client, monkeypatch):
+        import json
+        from datetime import datetime
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'current_schedule', {
+            'generated_at': datetime(2026, 2, 15, 12, 0),
+            'active_mode': '4day',
+            'modes': {'4day': {
+                'serialized_orders': [{'wo_number': f'WO-ND-{i}', 'on_time_status': 'On Time'}
+                                      for i in range(300)],
+                'stats': {'total_orders': 300},
+            }},
+        })
+        monkeypatch.setattr(app_module.gcs_storage, 'load_reorder_state', lambda: {
+            'mode': '4day', 'sequence': ['WO-ND-299'], 'created_at': '2026-02-15T13:00:00'})
+
+        response = auth_client.get('/api/schedule.ndjson?mode=4day')
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data().splitlines()]
+        header, orders = lines[0], lines[1:]
+        assert header['total_orders'] == 300
+        assert header['has_reorder'] is True
+        assert 'orders' not in header
+        assert len(orders) == 300
+        assert orders[0]['wo_number'] == 'WO-ND-299'
+
+
+class TestBackgroundPersistence:
+    """Tests for persist_in_background."""
+
+    def test_runs_save_and_preserves_order(self, app):
+        import app as app_module
+
+        saved = []
+        futures = [app_module.persist_in_background(saved.append, i) for i in range(5)]
+        for future in futures:
+            future.result(timeout=5)
+        assert saved == [0, 1, 2, 3, 4]
+
+    def test_failure_is_logged_not_raised(self, app, caplog):
+        import app as app_module
+
+        def failing_save(payload):
+            raise RuntimeError('bucket unavailable')
+
+        future = app_module.persist_in_background(failing_save, {})
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+        # Done-callbacks may run on the worker thread just after result() returns
+        app_module.persist_in_background(lambda: None).result(timeout=5)
+        assert 'Background save failed: bucket unavailable' in caplog.text
+
+
+class TestScheduledOrderSerialization:
+    """Tests for the shared ScheduledOrder -> dict serializer."""
+
+    def _order(self, on_time=True, buffer=None):
+        from datetime import datetime, timedelta
+        from algorithms.scheduler import ScheduledOrder
+
+        completion = datetime(2026, 2, 20, 14, 0)
+        return ScheduledOrder(
+            wo_number='WO-SER-1', part_number='PN-1', description='Stator',
+            customer='Acme', is_reline=False, assigned_core=None,
+            blast_date=datetime(2026, 2, 16, 6, 0), completion_date=completion,
+            promise_date=completion + buffer if buffer is not None else None,
+            on_time=on_time, turnaround_days=4,
+        )
+
+    @pytest.mark.parametrize('on_time,buffer_hours,expected', [
+        (False, 240, 'Late'),
+        (True, 71, 'At Risk'),
+        (True, 72, 'On Time'),
+        (True, -5, 'At Risk'),
+        (True, None, 'On Time'),
+    ])
+    def test_on_time_status(self, app, on_time, buffer_hours, expected):
+        from datetime import timedelta
+        import app as app_module
+
+        buffer = timedelta(hours=buffer_hours) if buffer_hours is not None else None
+        assert app_module._order_on_time_status(self._order(on_time, buffer)) == expected
+
+    def test_deadline_prefers_basic_finish_date(self, app):
+        from datetime import datetime, timedelta
+
+        order = self._order(buffer=timedelta(hours=10))
+        assert order.deadline == order.promise_date
+        order = self._order()
+        assert order.deadline is None
+
+        from algorithms.scheduler import ScheduledOrder
+        finish = datetime(2026, 3, 1)
+        order = ScheduledOrder(
+            wo_number='WO-SER-2', part_number='PN-1', description='Stator',
+            customer='Acme', is_reline=False, basic_finish_date=finish,
+            promise_date=datetime(2026, 3, 5),
+        )
+        assert order.deadline == finish
+
+    def test_serialized_fields(self, app):
+        import app as app_module
+
+        data = app_module._serialize_scheduled_order(self._order())
+        assert data['assigned_core'] == ''
+        assert data['blast_date'] == '2026-02-16T06:00:00'
+        assert data['promise_date'] is None
+        assert data['on_time_status'] == 'On Time'
+        assert data['turnaround_days'] == 4
+
+    def test_stats_from_serialized(self, app):
+        import app as app_module
+
+        stats = app_module._compute_stats_from_serialized([
+            {'on_time_status': 'On Time', 'turnaround_days': 4},
+            {'on_time_status': 'Late', 'turnaround_days': 7},
+            {'on_time_status': 'At Risk', 'turnaround_days': ''},
+            {'on_time_status': 'At Risk'},
+        ])
+        assert stats == {'total_orders': 4, 'on_time': 1, 'late': 1, 'at_risk': 2,
+                         'avg_turnaround': 5.5}
+        assert app_module._compute_stats_from_serialized([])['avg_turnaround'] == 0
+
+    def test_serialize_with_stats_matches_two_pass(self, app):
+        from datetime import timedelta
+        import app as app_module
+
+        orders = [self._order(), self._order(on_time=False, buffer=timedelta(hours=240)),
+                  self._order(buffer=timedelta(hours=10))]
+        serialized, stats = app_module._serialize_orders_with_stats(orders)
+        assert serialized == [app_module._serialize_scheduled_order(o) for o in orders]
+        assert stats == app_module._compute_stats_from_serialized(serialized)
+
+
+class TestDownloadEndpoint:
+    """Tests for GET /api/download/<filename>."""
+
+    def test_redirects_to_signed_url_when_available(self, auth_client, monkeypatch):
+        import gcs_storage
+
+        monkeypatch.setattr(gcs_storage, 'generate_download_url',
+                            lambda filename, folder: f'https://storage.example/{folder}/{filename}?sig=1')
+        response = auth_client.get('/api/download/Master_Schedule_4Day.xlsx')
+        assert response.status_code == 302
+        assert response.headers['Location'] == \
+            'https://storage.example/outputs/Master_Schedule_4Day.xlsx?sig=1'
+
+    def test_falls_back_to_streaming(self, auth_client):
+        # Local storage never signs; a missing file is a plain 404
+        response = auth_client.get('/api/download/Does_Not_Exist.xlsx')
+        assert response.status_code == 404
+
+
+class TestAllowedFile:
+    """Tests for upload extension filtering."""
+
+    @pytest.mark.parametrize('filename,expected', [
+        ('report.xlsx', True),
+        ('REPORT.XLS', True),
+        ('archive.xlsx.exe', False),
+        ('notes.txt', False),
+        ('xlsx', False),
+    ])
+    def test_allowed_file(self, app, filename, expected):
+        import app as app_module
+        assert app_module.allowed_file(filename) is expected
+
+
+class TestSimulationData:
+    """Tests for GET /api/simulation-data."""
+
+    def _schedule(self):
+        from datetime import datetime
+        from algorithms.scheduler import ScheduledOperation, ScheduledOrder
+
+        order = ScheduledOrder(
+            wo_number='WO-SIM-1', part_number='PN-1', description='Stator',
+            customer=None, is_reline=True, rubber_type='XE',
+            blast_date=datetime(2026, 2, 16, 6, 0),
+            completion_date=datetime(2026, 2, 18, 15, 30),
+            operations=[
+                ScheduledOperation('BLAST', datetime(2026, 2, 16, 6, 0), datetime(2026, 2, 16, 7, 0), 'BLAST'),
+                ScheduledOperation('INJECTION', datetime(2026, 2, 17, 9, 0), datetime(2026, 2, 17, 10, 30), 'D1'),
+            ],
+        )
+        return {'orders': [order], 'generated_at': datetime(2026, 2, 15, 12, 0)}
+
+    def test_serves_iso_timestamps_from_in_memory_schedule(self, auth_client, monkeypatch):
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'current_schedule', self._schedule())
+        saved = []
+        monkeypatch.setattr(app_module.gcs_storage, 'save_simulation_data', saved.append)
+
+        response = auth_client.get('/api/simulation-data')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['schedule_info'] == {
+            'start_date': '2026-02-16T06:00:00',
+            'end_date': '2026-02-18T15:30:00',
+            'total_orders': 1,
+            'generated_at': '2026-02-15T12:00:00',
+        }
+        part = data['parts'][0]
+        assert part['customer'] == ''
+        assert part['is_rework'] is True
+        assert data['op_fields'] == ['station', 'start', 'end', 'resource']
+        assert part['op_rows'][1] == ['INJECTION', '2026-02-17T09:00:00', '2026-02-17T10:30:00', 'D1']
+        assert saved == [response.data]
+        assert data['stations'] == app_module.SIMULATION_STATIONS
+        assert list(data) == ['schedule_info', 'stations', 'op_fields', 'parts']
+
+    def test_persisted_payload_round_trips(self, app, monkeypatch):
+        import gcs_storage
+
+        monkeypatch.setattr(gcs_storage, 'SIMULATION_DATA_FILE', 'state/test_simulation.json')
+        sched = self._schedule()
+        assert gcs_storage.save_simulation_data({'schedule_info': {'generated_at': sched['generated_at']}})
+        loaded = gcs_storage.load_simulation_data()
+        assert loaded['schedule_info']['generated_at'] == '2026-02-15T12:00:00'
+
+        assert gcs_storage.save_simulation_data(b'{"parts":[]}')
+        assert gcs_storage.load_simulation_data() == {'parts': []}
+
+    def test_repeat_requests_reuse_cached_body(self, auth_client, monkeypatch):
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'current_schedule', self._schedule())
+        saved = []
+        monkeypatch.setattr(app_module.gcs_storage, 'save_simulation_data', saved.append)
+
+        first = auth_client.get('/api/simulation-data')
+        second = auth_client.get('/api/simulation-data')
+        assert second.data == first.data
+        assert len(saved) == 1
+
+        etag = first.headers['ETag']
+        revalidated = auth_client.get('/api/simulation-data', headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304
+
+    def test_gzip_variant_for_accepting_clients(self, auth_client, monkeypatch):
+        import gzip
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'current_schedule', self._schedule())
+        monkeypatch.setattr(app_module.gcs_storage, 'save_simulation_data', lambda data: True)
+
+        plain = auth_client.get('/api/simulation-data')
+        compressed = auth_client.get('/api/simulation-data', headers={'Accept-Encoding': 'gzip, br'})
+        assert 'Content-Encoding' not in plain.headers
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert gzip.decompress(compressed.data) == plain.data
+        assert compressed.headers['ETag'] != plain.headers['ETag']
+
+    def test_persisted_fallback_is_cached(self, auth_client, monkeypatch):
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'current_schedule', {'orders': [], 'generated_at': None})
+        monkeypatch.setattr(app_module, '_persisted_simulation_cache', {'entry': None, 'expires': 0.0})
+        loads = []
+
+        def fake_load():
+            loads.append(1)
+            return {'schedule_info': {'total_orders': 0}, 'stations': [], 'parts': []}
+
+        monkeypatch.setattr(app_module.gcs_storage, 'load_simulation_data', fake_load)
+
+        first = auth_client.get('/api/simulation-data')
+        second = auth_client.get('/api/simulation-data')
+        assert first.status_code == second.status_code == 200
+        assert first.get_json()['stations'] == app_module.SIMULATION_STATIONS
+        assert second.data == first.data
+        assert len(loads) == 1
+
+
+
+def _worker_startup_state():
+    """Runs in a spawned worker: report whether app.py skipped its startup work."""
+    import app as app_module
+    return app_module._IN_WORKER_PROCESS, len(app_module.user_store.list_users())
+
+
+class TestScheduleWorkerProcesses:
+    """Tests for running DES passes in worker processes."""
+
+    def _loader(self, sample_orders, sample_core_mapping, sample_core_inventory):
+        from types import SimpleNamespace
+        return SimpleNamespace(orders=sample_orders, core_mapping=sample_core_mapping,
+                               core_inventory=sample_core_inventory, wip_in_process_orders=[],
+                               hot_list_entries=[{'wo_number': 'WO-002', 'priority': 'ASAP'}])
+
+    def test_in_process_when_single_worker(self, app, monkeypatch, sample_orders,
+                                           sample_core_mapping, sample_core_inventory):
+        import app as app_module
+
+        monkeypatch.setattr(app_module, 'SCHEDULE_PROCESS_WORKERS', 1)
+        loader = self._loader(sample_orders, sample_core_mapping, sample_core_inventory)
+        baseline_run, hot_run = app_module._start_schedule_mode(loader, [0, 1, 2, 3])
+        assert 'future' not in baseline_run and 'future' not in hot_run
+        scheduled, pending, shortages = app_module._worker_task_result(hot_run)
+        assert len(scheduled) > 0
+
+    def test_worker_pool_matches_in_process(self, app, monkeypatch, sample_orders,
+                                            sample_core_mapping, sample_core_inventory):
+        import app as app_module
+
+        loader = self._loader(sample_orders, sample_core_mapping, sample_core_inventory)
+        monkeypatch.setattr(app_module, 'SCHEDULE_PROCESS_WORKERS', 1)
+        local, _ = app_module._start_schedule_mode(loader, [0, 1, 2, 3], skip_hot_list=True)
+
+        monkeypatch.setattr(app_module, 'SCHEDULE_PROCESS_WORKERS', 2)
+        monkeypatch.setattr(app_module, '_schedule_process_pool', None)
+        try:
+            remote, hot_run = app_module._start_schedule_mode(loader, [0, 1, 2, 3], skip_hot_list=True)
+            assert hot_run is None and 'future' in remote
+            remote_orders = app_module._worker_task_result(remote)[0]
+        finally:
+            app_module._schedule_process_pool.shutdown()
+
+        local_orders = app_module._worker_task_result(local)[0]
+        assert [o.wo_number for o in remote_orders] == [o.wo_number for o in local_orders]
+        assert [o.blast_date.date() for o in remote_orders] == [o.blast_date.date() for o in local_orders]
+
+    def test_worker_skips_startup_side_effects(self, app):
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            in_worker, user_count = pool.submit(_worker_startup_state).result(timeout=60)
+        assert in_worker is True
+        assert user_count == 0
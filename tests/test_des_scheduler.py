@@ -3,7 +3,7 @@
 import pytest
 from datetime import datetime, timedelta
 
-from algorithms.des_scheduler import DESScheduler, WorkScheduleConfig, PartState
+from algorithms.des_scheduler import DESScheduler, WorkScheduleConfig, PartState, run_des_schedule
 
 
 class TestWorkScheduleConfig:
@@ -216,6 +216,16 @@ class TestDESSchedulerExecution:
         if hot_order:
             assert hot_order.priority in ('Hot-ASAP', 'Hot-Dated')
 
+    def test_run_des_schedule_returns_pass_results(self, sample_orders, sample_core_mapping, sample_core_inventory):
+        scheduled, pending, shortages = run_des_schedule(
+            sample_orders, sample_core_mapping, sample_core_inventory,
+            working_days=[0, 1, 2, 3], shift_hours=12,
+            hot_list_entries=[{'wo_number': 'WO-002', 'priority': 'ASAP'}]
+        )
+        assert len(scheduled) > 0
+        assert isinstance(pending, list)
+        assert isinstance(shortages, list)
+
 
 class TestPartState:
     """Tests for PartState data class."""
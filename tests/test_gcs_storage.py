@@ -0,0 +1,287 @@
+"""Tests for storage helpers in gcs_storage."""
+
+import gzip
+import json
+from datetime import datetime
+
+from gcs_storage import encode_state, decode_state
+
+
+class TestStateEncoding:
+    """Tests for compressed state encoding."""
+
+    def test_round_trip(self):
+        state = {
+            'generated_at': '2026-02-16T08:00:00',
+            'orders': [{'wo_number': 'WO-001', 'on_time': True, 'turnaround_days': None}],
+            'stats': {'total_orders': 1, 'avg_turnaround': 12.5},
+        }
+        assert decode_state(encode_state(state)) == state
+
+    def test_encoded_payload_is_gzip(self):
+        encoded = encode_state({'orders': [{'wo_number': f'WO-{i}'} for i in range(200)]})
+        assert encoded[:2] == b'\x1f\x8b'
+        assert json.loads(gzip.decompress(encoded))['orders'][0] == {'wo_number': 'WO-0'}
+
+    def test_decodes_legacy_plain_json(self):
+        legacy = json.dumps({'orders': [], 'stats': {'total_orders': 0}}).encode()
+        assert decode_state(legacy) == {'orders': [], 'stats': {'total_orders': 0}}
+
+    def test_datetimes_and_int_keys_serialized(self):
+        decoded = decode_state(encode_state({'at': datetime(2026, 2, 16, 8, 30), 'counts': {1: 'a'}}))
+        assert decoded == {'at': '2026-02-16T08:30:00', 'counts': {'1': 'a'}}
+
+
+class TestDownloadMany:
+    """Tests for concurrent input-file downloads."""
+
+    def test_local_download_skips_missing(self, tmp_path, monkeypatch):
+        import gcs_storage
+
+        monkeypatch.setattr(gcs_storage, 'LOCAL_STORAGE_DIR', str(tmp_path / 'store'))
+        src = gcs_storage._local_path(gcs_storage.UPLOADS_FOLDER, 'a.xlsx')
+        with open(src, 'wb') as f:
+            f.write(b'data')
+
+        dest = tmp_path / 'out'
+        dest.mkdir()
+        downloaded = gcs_storage.download_many(['a.xlsx', 'missing.xlsx'], str(dest))
+        assert downloaded == {'a.xlsx'}
+        assert (dest / 'a.xlsx').read_bytes() == b'data'
+
+    def test_gcs_download_uses_thread_workers(self, tmp_path, monkeypatch):
+        import gcs_storage
+
+        class FakeNotFound(Exception):
+            pass
+
+        class FakeBucket:
+            def blob(self, path, chunk_size=None):
+                assert chunk_size == gcs_storage.TRANSFER_CHUNK_SIZE
+                return path
+
+        calls = {}
+
+        class FakeTransferManager:
+            THREAD = 'thread'
+
+            @staticmethod
+            def download_many(pairs, max_workers, worker_type):
+                calls['pairs'] = pairs
+                calls['worker_type'] = worker_type
+                return [None, FakeNotFound()]
+
+        monkeypatch.setattr(gcs_storage, 'USE_LOCAL_STORAGE', False)
+        monkeypatch.setattr(gcs_storage, 'get_bucket', lambda: FakeBucket())
+        monkeypatch.setattr(gcs_storage, 'transfer_manager', FakeTransferManager, raising=False)
+        monkeypatch.setattr(gcs_storage, 'NotFound', FakeNotFound, raising=False)
+
+        downloaded = gcs_storage.download_many(['a.xlsx', 'b.xlsx'], str(tmp_path))
+        assert downloaded == {'a.xlsx'}
+        assert calls['worker_type'] == 'thread'
+        assert calls['pairs'][0] == ('uploads/a.xlsx', str(tmp_path / 'a.xlsx'))
+
+
+class TestUploadFile:
+    """Tests for chunked and parallel report uploads."""
+
+    def _fake_gcs(self, monkeypatch):
+        import gcs_storage
+
+        calls = {}
+
+        class FakeBlob:
+            def __init__(self, path, chunk_size=None):
+                calls['blob'] = (path, chunk_size)
+
+            def upload_from_filename(self, path, timeout=None):
+                calls['single'] = (path, timeout)
+
+        class FakeBucket:
+            def blob(self, path, chunk_size=None):
+                return FakeBlob(path, chunk_size)
+
+        class FakeTransferManager:
+            THREAD = 'thread'
+
+            @staticmethod
+            def upload_chunks_concurrently(path, blob, chunk_size, max_workers, worker_type):
+                calls['parallel'] = (path, chunk_size, max_workers, worker_type)
+
+        monkeypatch.setattr(gcs_storage, 'USE_LOCAL_STORAGE', False)
+        monkeypatch.setattr(gcs_storage, 'get_bucket', lambda: FakeBucket())
+        monkeypatch.setattr(gcs_storage, 'transfer_manager', FakeTransferManager, raising=False)
+        return calls
+
+    def test_small_file_uses_single_chunked_upload(self, tmp_path, monkeypatch):
+        import gcs_storage
+
+        calls = self._fake_gcs(monkeypatch)
+        path = tmp_path / 'small.xlsx'
+        path.write_bytes(b'x' * 1024)
+
+        gcs_storage.upload_file(str(path), 'small.xlsx', gcs_storage.OUTPUTS_FOLDER)
+        assert calls['blob'] == ('outputs/small.xlsx', gcs_storage.TRANSFER_CHUNK_SIZE)
+        assert calls['single'] == (str(path), gcs_storage.UPLOAD_TIMEOUT)
+        assert 'parallel' not in calls
+
+    def test_large_file_uploads_chunks_concurrently(self, tmp_path, monkeypatch):
+        import gcs_storage
+
+        calls = self._fake_gcs(monkeypatch)
+        monkeypatch.setattr(gcs_storage, 'PARALLEL_UPLOAD_THRESHOLD', 1024)
+        path = tmp_path / 'master.xlsx'
+        path.write_bytes(b'x' * 2048)
+
+        gcs_storage.upload_file(str(path), 'master.xlsx', gcs_storage.OUTPUTS_FOLDER)
+        assert calls['parallel'] == (str(path), gcs_storage.TRANSFER_CHUNK_SIZE,
+                                     gcs_storage.PARALLEL_UPLOAD_WORKERS, 'thread')
+        assert 'single' not in calls
+
+
+class TestGetClient:
+    """Tests for the shared GCS client."""
+
+    def test_client_created_once_with_larger_pool(self, monkeypatch):
+        import gcs_storage
+
+        created = []
+        mounted = []
+
+        class FakeSession:
+            def mount(self, prefix, adapter):
+                mounted.append((prefix, adapter))
+
+        class FakeClient:
+            def __init__(self):
+                created.append(self)
+                self._http = FakeSession()
+
+        class FakeStorage:
+            Client = FakeClient
+
+        monkeypatch.setattr(gcs_storage, 'USE_LOCAL_STORAGE', False)
+        monkeypatch.setattr(gcs_storage, 'storage', FakeStorage, raising=False)
+        monkeypatch.setattr(gcs_storage, 'HTTPAdapter', lambda **kwargs: kwargs, raising=False)
+        monkeypatch.setattr(gcs_storage, '_client', None)
+
+        assert gcs_storage.get_client() is gcs_storage.get_client()
+        assert len(created) == 1
+        assert mounted == [('https://', {'pool_connections': gcs_storage.HTTP_POOL_SIZE,
+                                         'pool_maxsize': gcs_storage.HTTP_POOL_SIZE})]
+
+
+class TestPendingRequestCount:
+    """Tests for the cached pending special request count."""
+
+    def test_count_cached_and_refreshed_on_save(self, monkeypatch):
+        import gcs_storage
+
+        loads = []
+        stored = [{'status': 'pending'}, {'status': 'approved'}]
+
+        def fake_load():
+            loads.append(1)
+            return stored
+
+        monkeypatch.setattr(gcs_storage, 'load_special_requests', fake_load)
+        monkeypatch.setattr(gcs_storage, '_local_save_json', lambda path, data: None)
+        monkeypatch.setattr(gcs_storage, '_pending_count_cache', {'count': None, 'expires': 0.0})
+
+        assert gcs_storage.count_pending_special_requests() == 1
+        assert gcs_storage.count_pending_special_requests() == 1
+        assert len(loads) == 1
+
+        gcs_storage.save_special_requests([{'status': 'pending'}] * 3)
+        assert gcs_storage.count_pending_special_requests() == 3
+        assert len(loads) == 1
+
+
+class TestSpecialRequestsCache:
+    """Tests for the short-lived special requests download cache."""
+
+    def test_gcs_load_reuses_download_and_returns_copies(self, monkeypatch):
+        import gcs_storage
+
+        class FakeNotFound(Exception):
+            pass
+
+        downloads = []
+        uploads = []
+
+        class FakeBlob:
+            def download_as_bytes(self):
+                downloads.append(1)
+                return b'[{"id": "SR-1", "status": "pending"}]'
+
+            def upload_from_string(self, data, content_type=None):
+                uploads.append(data)
+
+        class FakeBucket:
+            def blob(self, path):
+                assert path == gcs_storage.SPECIAL_REQUESTS_FILE
+                return FakeBlob()
+
+        monkeypatch.setattr(gcs_storage, 'USE_LOCAL_STORAGE', False)
+        monkeypatch.setattr(gcs_storage, 'NotFound', FakeNotFound, raising=False)
+        monkeypatch.setattr(gcs_storage, 'get_bucket', lambda: FakeBucket())
+        monkeypatch.setattr(gcs_storage, '_special_requests_cache', {'data': None, 'expires': 0.0})
+
+        first = gcs_storage.load_special_requests()
+        first[0]['status'] = 'approved'
+        assert gcs_storage.load_special_requests() == [{'id': 'SR-1', 'status': 'pending'}]
+        assert len(downloads) == 1
+
+        # A save replaces the cached bytes with what was written
+        gcs_storage.save_special_requests([{'id': 'SR-2', 'status': 'pending'}])
+        assert gcs_storage.load_special_requests() == [{'id': 'SR-2', 'status': 'pending'}]
+        assert len(downloads) == 1 and len(uploads) == 1
+
+
+class TestSignedDownloadUrl:
+    """Tests for signing report downloads with metadata-server credentials."""
+
+    def test_refreshes_token_only_when_expired(self, monkeypatch):
+        import gcs_storage
+
+        class FakeSigning:
+            pass
+
+        class FakeCredentials:
+            service_account_email = 'runner@example.iam.gserviceaccount.com'
+            token = 'token-1'
+            valid = True
+            refreshes = 0
+
+            def refresh(self, request):
+                FakeCredentials.refreshes += 1
+                self.token = f'token-{FakeCredentials.refreshes + 1}'
+                self.valid = True
+
+        signed = []
+
+        class FakeBlob:
+            def generate_signed_url(self, **kwargs):
+                signed.append(kwargs)
+                return 'https://signed.example/report.xlsx'
+
+        class FakeClient:
+            def bucket(self, name):
+                return type('FakeBucket', (), {'blob': lambda self, path: FakeBlob()})()
+
+        credentials = FakeCredentials()
+        monkeypatch.setattr(gcs_storage, 'USE_LOCAL_STORAGE', False)
+        monkeypatch.setattr(gcs_storage, 'SIGNED_DOWNLOADS', True)
+        monkeypatch.setattr(gcs_storage, 'get_client', lambda: FakeClient())
+        monkeypatch.setattr(gcs_storage, 'get_credentials', lambda: credentials)
+        monkeypatch.setattr(gcs_storage, 'Signing', FakeSigning, raising=False)
+        monkeypatch.setattr(gcs_storage, 'Request', lambda: None, raising=False)
+
+        assert gcs_storage.generate_download_url('report.xlsx') == 'https://signed.example/report.xlsx'
+        assert FakeCredentials.refreshes == 0
+        assert signed[0]['access_token'] == 'token-1'
+
+        credentials.valid = False
+        gcs_storage.generate_download_url('report.xlsx')
+        assert FakeCredentials.refreshes == 1
+        assert signed[1]['access_token'] == 'token-2'
@@ -0,0 +1,48 @@
+"""Tests for the user store."""
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from user_store import UserStore, hash_password
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """UserStore that never writes to storage."""
+    user_store = UserStore()
+    monkeypatch.setattr(user_store, 'save', lambda: True)
+    return user_store
+
+
+class TestSeedFromEnv:
+    """Tests for seeding users from environment variables."""
+
+    def test_precomputed_admin_hash_used_as_is(self, store):
+        precomputed = generate_password_hash('s3cret', method='pbkdf2:sha256:1000')
+        store.seed_from_env('boss', 'ignored', admin_password_hash=precomputed)
+        admin = store.get('boss')
+        assert admin.password_hash == precomputed
+        assert admin.check_password('s3cret')
+        assert not admin.check_password('ignored')
+
+    def test_plain_passwords_hashed_with_configured_method(self, store):
+        store.seed_from_env('boss', 'adminpw', 'alice:alicepw:planner')
+        assert store.get('boss').check_password('adminpw')
+        alice = store.get('alice')
+        assert alice.role == 'planner'
+        assert alice.password_hash.startswith('scrypt:')
+        assert alice.check_password('alicepw')
+
+    def test_env_users_hashed_in_parallel_keep_first_entry(self, store):
+        store.seed_from_env('boss', 'adminpw', 'alice:alicepw:planner,bob:bobpw,alice:other,boss:nope:guest')
+        assert store.get('boss').role == 'admin'
+        assert store.get('boss').check_password('adminpw')
+        assert store.get('alice').check_password('alicepw')
+        assert store.get('bob').role == 'guest'
+        assert store.get('bob').check_password('bobpw')
+        assert len(store.list_users()) == 3
+
+
+def test_hash_password_verifies():
+    from werkzeug.security import check_password_hash
+    assert check_password_hash(hash_password('pw123456'), 'pw123456')